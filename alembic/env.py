@@ -23,6 +23,10 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from src.db_migration_api.models import Base
 target_metadata = Base.metadata
 
+# Migrate the same database the app uses when DATABASE_URL is set
+if os.getenv("DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", os.environ["DATABASE_URL"])
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -0,0 +1,38 @@
+"""Jobs unique key and lookup indexes
+
+Revision ID: 2b7e9c4d1f60
+Revises: 8f3c1d2e4a5b
+Create Date: 2025-09-27 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b7e9c4d1f60'
+down_revision: Union[str, Sequence[str], None] = '8f3c1d2e4a5b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Batch mode so SQLite, which cannot ALTER in constraints, rebuilds the table
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.create_unique_constraint('uq_jobs_job_dept', ['job', 'department_id'])
+    op.create_index('ix_jobs_department_id', 'jobs', ['department_id'], unique=False)
+    op.create_index('ix_employees_dept', 'employees', ['department_id'], unique=False)
+    op.create_index('ix_employees_job', 'employees', ['job_id'], unique=False)
+    op.create_index('ix_employees_datetime', 'employees', ['datetime'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_employees_datetime', table_name='employees')
+    op.drop_index('ix_employees_job', table_name='employees')
+    op.drop_index('ix_employees_dept', table_name='employees')
+    op.drop_index('ix_jobs_department_id', table_name='jobs')
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_constraint('uq_jobs_job_dept', type_='unique')
@@ -0,0 +1,51 @@
+"""Timestamp server defaults
+
+Revision ID: c5d8a3f1e927
+Revises: 2b7e9c4d1f60
+Create Date: 2025-09-27 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d8a3f1e927'
+down_revision: Union[str, Sequence[str], None] = '2b7e9c4d1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['departments', 'jobs', 'employees']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        # Backfill rows written without timestamps before the columns become NOT NULL
+        op.execute(f"UPDATE {table} SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+        op.execute(f"UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL")
+        with op.batch_alter_table(table) as batch_op:
+            for column in ['created_at', 'updated_at']:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.DateTime(),
+                    type_=sa.DateTime(timezone=True),
+                    server_default=sa.func.now(),
+                    nullable=False
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            for column in ['created_at', 'updated_at']:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.DateTime(timezone=True),
+                    type_=sa.DateTime(),
+                    server_default=None,
+                    nullable=True
+                )
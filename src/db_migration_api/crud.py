@@ -1,70 +1,94 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
 from sqlalchemy.exc import IntegrityError
-from typing import List, Dict, Any
+from sqlalchemy.orm import Session
+from typing import Dict, Tuple
+import io
+import pyarrow as pa
+from pyarrow import csv as pacsv
 from . import models, schemas
 
 
 def create_department(db: Session, department: schemas.DepartmentCreate) -> models.Department:
     """Create a new department"""
-    db_department = models.Department(**department.dict())
-    db.add(db_department)
+    # RETURNING loads the server-generated id and timestamps in the same round-trip
+    stmt = insert(models.Department).values(**department.model_dump()).returning(models.Department)
+    db_department = db.execute(stmt).scalar_one()
     db.commit()
-    db.refresh(db_department)
     return db_department
 
 
 def create_job(db: Session, job: schemas.JobCreate) -> models.Job:
     """Create a new job"""
-    db_job = models.Job(**job.dict())
-    db.add(db_job)
+    stmt = insert(models.Job).values(**job.model_dump()).returning(models.Job)
+    db_job = db.execute(stmt).scalar_one()
     db.commit()
-    db.refresh(db_job)
     return db_job
 
 
 def create_employee(db: Session, employee: schemas.EmployeeCreate) -> models.Employee:
     """Create a new employee"""
-    db_employee = models.Employee(**employee.dict())
-    db.add(db_employee)
+    stmt = insert(models.Employee).values(**employee.model_dump()).returning(models.Employee)
+    db_employee = db.execute(stmt).scalar_one()
     db.commit()
-    db.refresh(db_employee)
     return db_employee
 
 
-def batch_create_departments(db: Session, departments: List[Dict[str, Any]]) -> int:
-    """Create multiple departments in batch"""
-    try:
-        db_departments = [models.Department(**dept) for dept in departments]
-        db.add_all(db_departments)
-        db.commit()
-        return len(db_departments)
-    except IntegrityError:
-        db.rollback()
-        raise
+# Destination table name -> table; hired_employees is loaded into employees
+_BULK_TABLES = {
+    'departments': models.Department.__table__,
+    'jobs': models.Job.__table__,
+    'employees': models.Employee.__table__,
+    'hired_employees': models.Employee.__table__
+}
+
+# Batches larger than this are loaded with COPY when running on PostgreSQL
+COPY_THRESHOLD = 500
 
 
-def batch_create_jobs(db: Session, jobs: List[Dict[str, Any]]) -> int:
-    """Create multiple jobs in batch"""
+def bulk_load_arrow(db: Session, data: pa.Table, dest: str, commit: bool = True) -> int:
+    """Load a validated Arrow table into a destination table"""
+    table = _BULK_TABLES[dest]
     try:
-        db_jobs = [models.Job(**job) for job in jobs]
-        db.add_all(db_jobs)
-        db.commit()
-        return len(db_jobs)
-    except IntegrityError:
+        if data.num_rows > COPY_THRESHOLD and db.get_bind().dialect.name == 'postgresql':
+            # Serialize the columns straight to CSV for COPY (server defaults fill the timestamps)
+            buffer = io.BytesIO()
+            pacsv.write_csv(data, buffer, write_options=pacsv.WriteOptions(include_header=False))
+            buffer.seek(0)
+            
+            copy_sql = f"COPY {table.name} ({', '.join(data.column_names)}) FROM STDIN WITH (FORMAT csv)"
+            raw_connection = db.connection().connection
+            with raw_connection.cursor() as cursor:
+                try:
+                    cursor.copy_expert(copy_sql, buffer)
+                except db.get_bind().dialect.loaded_dbapi.IntegrityError as e:
+                    # The raw cursor bypasses SQLAlchemy's exception wrapping; raise what
+                    # the INSERT path would, so callers handle conflicts the same way
+                    raise IntegrityError(copy_sql, None, e) from e
+        elif data.num_rows:
+            db.execute(table.insert(), data.to_pylist())
+        
+        if commit:
+            db.commit()
+        return data.num_rows
+    except Exception:
         db.rollback()
         raise
 
 
-def batch_create_employees(db: Session, employees: List[Dict[str, Any]]) -> int:
-    """Create multiple employees in batch"""
-    try:
-        db_employees = [models.Employee(**emp) for emp in employees]
-        db.add_all(db_employees)
-        db.commit()
-        return len(db_employees)
-    except IntegrityError:
-        db.rollback()
-        raise
+def load_department_index(db: Session) -> Dict[str, int]:
+    """Load all departments as a name -> id map in a single query"""
+    return {
+        department: department_id
+        for department, department_id in db.query(models.Department.department, models.Department.id)
+    }
+
+
+def load_job_index(db: Session) -> Dict[Tuple[str, int], int]:
+    """Load all jobs as a (job, department_id) -> id map in a single query"""
+    return {
+        (job, department_id): job_id
+        for job, department_id, job_id in db.query(models.Job.job, models.Job.department_id, models.Job.id)
+    }
 
 
 def get_department_by_name(db: Session, department: str) -> models.Department:
@@ -1,5 +1,6 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -9,15 +10,30 @@ DATABASE_URL = os.getenv(
     "sqlite:///./test.db"
 )
 
+
+def make_engine(database_url: str):
+    """Create an engine for a database URL"""
+    url = make_url(database_url)
+    kwargs = {}
+    if url.get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+        # An in-memory database only exists on its one connection, so share it;
+        # everything else keeps a real pool so concurrent requests (the handlers
+        # run in the threadpool) never share a connection or its transaction
+        if url.database in (None, "", ":memory:"):
+            kwargs["poolclass"] = StaticPool
+    
+    # executemany() INSERTs are sent as multi-row VALUES pages of up to 1000 rows;
+    # on PostgreSQL/psycopg2 this is SQLAlchemy's default executemany_mode="values_plus_batch"
+    return create_engine(database_url, insertmanyvalues_page_size=1000, **kwargs)
+
+
 # Create engine
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=StaticPool,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+engine = make_engine(DATABASE_URL)
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay loaded after commit, so rows fetched with RETURNING are not re-selected
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
 def get_db():
@@ -1,11 +1,20 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from .routes import router
 from .database import create_tables
 
+# FastAPI releases that deprecate ORJSONResponse serialize response models to
+# JSON bytes with Pydantic directly, which is faster but only applies while the
+# default response class is left unset; older releases get orjson instead
+response_class_options = (
+    {} if getattr(ORJSONResponse, "__deprecated__", None) else {"default_response_class": ORJSONResponse}
+)
+
 app = FastAPI(
     title="DB Migration API",
     description="API for migrating CSV data to PostgreSQL database",
-    version="1.0.0"
+    version="1.0.0",
+    **response_class_options
 )
 
 # Include routes
@@ -1,20 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Set
 import logging
+import os
 
 from .database import get_db
 from .schemas import HealthResponse, UploadResponse, BatchInsertResponse, BatchInsertRequest
-from .crud import (
-    batch_create_departments, batch_create_jobs, batch_create_employees,
-    get_department_by_name, get_job_by_name_and_department
-)
-from .utils import parse_csv_content, get_table_validator, validate_batch_data
+from .crud import bulk_load_arrow, load_department_index, load_job_index
+from .utils import iter_csv_batches, get_table_validator, validate_batch_data
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Tables accepted by the upload and batch-insert endpoints
+VALID_TABLES = frozenset({'departments', 'jobs', 'employees', 'hired_employees'})
+
+# Tables whose rows may name their department / job instead of giving its id
+DEPARTMENT_REFERENCE_TABLES = frozenset({'jobs', 'employees', 'hired_employees'})
+JOB_REFERENCE_TABLES = frozenset({'employees', 'hired_employees'})
+
+# Largest accepted CSV upload in bytes
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 100 * 1024 * 1024))
+
+
+def _load_reference_indexes(db: Session, table: str, fields: Set[str]) -> dict:
+    """Preload the name -> id lookups a table's validator needs, only when some row carries a name"""
+    indexes = {}
+    if table in DEPARTMENT_REFERENCE_TABLES and 'department' in fields:
+        indexes['department_index'] = load_department_index(db)
+    if table in JOB_REFERENCE_TABLES and 'job' in fields:
+        indexes['job_index'] = load_job_index(db)
+    return indexes
+
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -23,101 +42,112 @@ async def health_check():
 
 
 @router.post("/upload-csv", response_model=UploadResponse)
-async def upload_csv(
+def upload_csv(
     table: str = Query(..., description="Table name (departments, jobs, employees)"),
     file: UploadFile = File(..., description="CSV file to upload"),
     db: Session = Depends(get_db)
 ):
-    """Upload and process CSV file"""
+    """Upload and process CSV file (sync, so FastAPI runs it in the threadpool)"""
     
     # Validate table name
-    valid_tables = ['departments', 'jobs', 'employees', 'hired_employees']
-    if table not in valid_tables:
+    if table not in VALID_TABLES:
         raise HTTPException(
             status_code=400, 
-            detail=f"Invalid table name. Must be one of: {valid_tables}"
+            detail=f"Invalid table name. Must be one of: {sorted(VALID_TABLES)}"
         )
     
     # Validate file type
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV")
     
+    # Starlette has already spooled the upload to a temporary file; reject
+    # oversized files before parsing any of it
+    file_size = file.size if file.size is not None else file.file.seek(0, os.SEEK_END)
+    file.file.seek(0)
+    if file_size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {MAX_UPLOAD_BYTES} bytes"
+        )
+    
     try:
-        # Read file content
-        content = await file.read()
-        logger.info(f"File content length: {len(content)}")
-        
-        # Parse CSV
-        df = parse_csv_content(content)
-        logger.info(f"Parsed DataFrame: {df.shape}")
-        
         # Get validator for the table
         validator = get_table_validator(table)
-        validated_data = validator(df)
-        logger.info(f"Validated data count: {len(validated_data)}")
         
-        if not validated_data:
+        # Stream the spooled upload through parse -> validate -> insert one
+        # batch at a time, committing once at the end so the upload stays atomic
+        records_inserted = 0
+        for batch in iter_csv_batches(file.file, table):
+            logger.debug("Parsed CSV batch: %d rows", batch.num_rows)
+            validated_data = validator(batch)
+            logger.debug("Validated data count: %d", validated_data.num_rows)
+            
+            records_inserted += bulk_load_arrow(db, validated_data, table, commit=False)
+        
+        if not records_inserted:
             raise HTTPException(status_code=400, detail="No valid data found in CSV")
         
-        # Insert data based on table
-        records_inserted = 0
-        if table == 'departments':
-            records_inserted = batch_create_departments(db, validated_data)
-        elif table == 'jobs':
-            records_inserted = batch_create_jobs(db, validated_data)
-        elif table in ['employees', 'hired_employees']:
-            records_inserted = batch_create_employees(db, validated_data)
+        db.commit()
         
         return UploadResponse(
             message=f"Successfully uploaded {records_inserted} records to {table}",
             records_inserted=records_inserted
         )
         
+    except HTTPException:
+        db.rollback()
+        raise
+    except IntegrityError as e:
+        db.rollback()
+        logger.error(f"IntegrityError: {e.orig}")
+        raise HTTPException(status_code=409, detail="Records conflict with existing data")
     except ValueError as e:
+        db.rollback()
         logger.error(f"ValueError: {e}")
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        db.rollback()
         logger.error(f"Error processing CSV: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.post("/batch-insert", response_model=BatchInsertResponse)
-async def batch_insert(
+def batch_insert(
     table: str = Query(..., description="Table name (departments, jobs, employees)"),
     request: BatchInsertRequest = ...,
     db: Session = Depends(get_db)
 ):
-    """Batch insert records (1-1000 records)"""
+    """Batch insert records (1-1000 records, runs in the threadpool)"""
     
     # Validate table name
-    valid_tables = ['departments', 'jobs', 'employees', 'hired_employees']
-    if table not in valid_tables:
+    if table not in VALID_TABLES:
         raise HTTPException(
             status_code=400, 
-            detail=f"Invalid table name. Must be one of: {valid_tables}"
+            detail=f"Invalid table name. Must be one of: {sorted(VALID_TABLES)}"
         )
     
     try:
         # Validate batch data
-        validated_data = validate_batch_data(request.data, table)
+        # Skip the lookup queries entirely when no row carries a name
+        fields = {key for row in request.data for key in row}
+        indexes = _load_reference_indexes(db, table, fields)
+        validated_data = validate_batch_data(request.data, table, **indexes)
         
-        if not validated_data:
+        if not validated_data.num_rows:
             raise HTTPException(status_code=400, detail="No valid data provided")
         
-        # Insert data based on table
-        records_inserted = 0
-        if table == 'departments':
-            records_inserted = batch_create_departments(db, validated_data)
-        elif table == 'jobs':
-            records_inserted = batch_create_jobs(db, validated_data)
-        elif table in ['employees', 'hired_employees']:
-            records_inserted = batch_create_employees(db, validated_data)
+        records_inserted = bulk_load_arrow(db, validated_data, table)
         
         return BatchInsertResponse(
             message=f"Successfully inserted {records_inserted} records into {table}",
             records_inserted=records_inserted
         )
         
+    except HTTPException:
+        raise
+    except IntegrityError as e:
+        logger.error(f"IntegrityError: {e.orig}")
+        raise HTTPException(status_code=409, detail="Records conflict with existing data")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -1,6 +1,9 @@
-from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from datetime import datetime, timezone
+from typing import List, Optional
+
+# Module-level alias: inside EmployeeBatchRow the `datetime` field shadows the type
+OptionalDatetime = Optional[datetime]
 
 
 # Department schemas
@@ -17,8 +20,7 @@ class Department(DepartmentBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Job schemas
@@ -36,8 +38,7 @@ class Job(JobBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Employee schemas
@@ -57,13 +58,47 @@ class Employee(EmployeeBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Batch insert schemas
 class BatchInsertRequest(BaseModel):
-    data: List[dict] = Field(..., min_items=1, max_items=1000)
+    data: List[dict] = Field(..., min_length=1, max_length=1000)
+
+
+# Typed batch rows, validated per table with a cached TypeAdapter. Rows may
+# carry either ids or names for their references; an optional id is ignored
+class BatchRow(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    id: Optional[int] = None
+
+
+class DepartmentBatchRow(BatchRow):
+    department: Optional[str] = Field(None, max_length=100)
+
+
+class JobBatchRow(BatchRow):
+    job: Optional[str] = Field(None, max_length=100)
+    department_id: Optional[int] = None
+    department: Optional[str] = Field(None, max_length=100)
+
+
+class EmployeeBatchRow(BatchRow):
+    name: Optional[str] = Field(None, max_length=100)
+    datetime: OptionalDatetime = None
+    department_id: Optional[int] = None
+    job_id: Optional[int] = None
+    department: Optional[str] = Field(None, max_length=100)
+    job: Optional[str] = Field(None, max_length=100)
+
+    @field_validator('datetime')
+    @classmethod
+    def to_naive_utc(cls, value: OptionalDatetime) -> OptionalDatetime:
+        """Store aware datetimes as naive UTC, like the CSV path"""
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
 
 
 # Response schemas
@@ -1,75 +1,166 @@
-import pandas as pd
-import io
-from typing import List, Dict, Any
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
+from typing import List, Dict, Any, BinaryIO, Iterator, Optional, Tuple
 import logging
+from pydantic import TypeAdapter
+
+from .schemas import DepartmentBatchRow, JobBatchRow, EmployeeBatchRow
 
 logger = logging.getLogger(__name__)
 
 
-def parse_csv_content(csv_content: bytes) -> pd.DataFrame:
-    """Parse CSV content from bytes to pandas DataFrame"""
+# Column layout of the headerless CSV files accepted for each table
+_CSV_COLUMNS = {
+    'departments': ['id', 'department'],
+    'jobs': ['id', 'job'],
+    'employees': ['id', 'name', 'datetime', 'department_id', 'job_id'],
+    'hired_employees': ['id', 'name', 'datetime', 'department_id', 'job_id']
+}
+
+# Shared CSV reader settings. Types are declared up-front so Arrow does not
+# re-infer them per block; datetimes stay strings and are parsed by the validator
+_PARSE_OPTIONS = pacsv.ParseOptions(delimiter=',')
+_CONVERT_OPTIONS = pacsv.ConvertOptions(
+    column_types={
+        'id': pa.int64(),
+        'datetime': pa.string(),
+        'department_id': pa.int64(),
+        'job_id': pa.int64()
+    },
+    strings_can_be_null=True
+)
+
+
+def _read_options(table: str, block_size: int) -> pacsv.ReadOptions:
+    """Build Arrow read options naming the columns of a table's CSV layout"""
     try:
-        csv_string = csv_content.decode('utf-8')
-        logger.info("CSV content preview: %s...", csv_string[:200])
-        
-        # Always parse without headers first, then auto-detect format
-        df = pd.read_csv(io.StringIO(csv_string), header=None, sep=',')
-        logger.info("Parsed DataFrame shape: %s", df.shape)
-        logger.info("DataFrame columns: %s", df.columns.tolist())
-        
-        # Auto-detect format based on number of columns
-        if len(df.columns) == 2:
-            # For 2 columns, assume it's id,department or id,job
-            # Check if it's departments or jobs by looking at first row
-            first_row = df.iloc[0, 1] if len(df) > 0 else ""
-            logger.info("First row second column: %s", first_row)
-            
-            if "Product Management" in str(first_row) or "Sales" in str(first_row) or "Engineering" in str(first_row):
-                df.columns = ['id', 'department']
-            elif "Recruiter" in str(first_row) or "Manager" in str(first_row) or "Assistant" in str(first_row) or "VP" in str(first_row):
-                df.columns = ['id', 'job']
-            else:
-                df.columns = ['id', 'name']  # fallback
-        elif len(df.columns) == 4:
-            df.columns = ['id', 'name', 'datetime', 'department_id']
-        elif len(df.columns) == 5:
-            df.columns = ['id', 'name', 'datetime', 'department_id', 'job_id']
-        
-        logger.info("Final DataFrame columns: %s", df.columns.tolist())
-        return df
-    except Exception as e:
+        column_names = _CSV_COLUMNS[table]
+    except KeyError:
+        raise ValueError(f"Unsupported table: {table}. Supported tables: {list(_CSV_COLUMNS.keys())}") from None
+    
+    return pacsv.ReadOptions(block_size=block_size, column_names=column_names)
+
+
+def iter_csv_batches(source: BinaryIO, table: str, block_size: int = 4 << 20) -> Iterator[pa.Table]:
+    """Stream a table's CSV file object as Arrow tables of at most ~block_size bytes each"""
+    read_options = _read_options(table, block_size=block_size)
+    try:
+        reader = pacsv.open_csv(
+            source,
+            read_options=read_options,
+            parse_options=_PARSE_OPTIONS,
+            convert_options=_CONVERT_OPTIONS
+        )
+        for batch in reader:
+            yield pa.Table.from_batches([batch])
+    except (pa.ArrowException, UnicodeDecodeError) as e:
         logger.error("Error parsing CSV: %s", e)
         raise ValueError("Invalid CSV format: %s" % e) from e
 
 
-def validate_departments_data(df: pd.DataFrame) -> List[Dict[str, Any]]:
-    """Validate and prepare departments data from DataFrame"""
-    logger.info("DataFrame columns: %s", df.columns.tolist())
-    logger.info("DataFrame shape: %s", df.shape)
-    logger.info("First few rows: %s", df.head())
+def _clean_strings(values: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Strip surrounding whitespace, turning empty strings into nulls"""
+    values = pc.utf8_trim_whitespace(pc.cast(values, pa.string()))
+    return pc.if_else(pc.equal(values, ''), None, values)
+
+
+def _parse_datetimes(values: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Parse ISO 8601 strings to naive UTC timestamps, unparseable values become null"""
+    if pa.types.is_timestamp(values.type):
+        return pc.cast(values, pa.timestamp('us'))
+    
+    # Normalize to 'YYYY-MM-DD[THH:MM:SS[zone]]'; sub-second precision is not kept
+    # and times given to the minute get ':00' seconds
+    values = pc.utf8_trim_whitespace(pc.cast(values, pa.string()))
+    values = pc.replace_substring(values, ' ', 'T', max_replacements=1)
+    values = pc.replace_substring_regex(values, r'\.\d+', '')
+    values = pc.replace_substring_regex(values, r'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2})([^:\d].*)?$', r'\1:00\2')
+    zoned = pc.strptime(values, format='%Y-%m-%dT%H:%M:%S%z', unit='us', error_is_null=True)
+    naive = pc.strptime(values, format='%Y-%m-%dT%H:%M:%S', unit='us', error_is_null=True)
+    date_only = pc.strptime(values, format='%Y-%m-%d', unit='us', error_is_null=True)
+    return pc.coalesce(pc.cast(zoned, pa.timestamp('us')), naive, date_only)
+
+
+def _lookup_ids(keys: pa.ChunkedArray, index: Dict[Any, int]) -> pa.ChunkedArray:
+    """Map each key to its id in a preloaded index, null when unknown"""
+    value_set = pa.array(list(index.keys()), type=keys.type)
+    ids = pa.array(list(index.values()), type=pa.int64())
+    return pc.take(ids, pc.index_in(keys, value_set=value_set))
+
+
+def _job_keys(jobs: pa.ChunkedArray, department_ids: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Build 'job<US>department_id' composite keys for job index lookups"""
+    return pc.binary_join_element_wise(
+        _clean_strings(jobs), pc.cast(department_ids, pa.string()), '\x1f'
+    )
+
+
+def _has_values(*columns: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Row mask that is true where every column is non-null"""
+    mask = pc.is_valid(columns[0])
+    for column in columns[1:]:
+        mask = pc.and_(mask, pc.is_valid(column))
+    return mask
+
+
+def validate_departments_data(data: pa.Table) -> pa.Table:
+    """Validate and prepare departments data from an Arrow table"""
+    logger.debug("Table columns: %s", data.column_names)
+    logger.debug("Table shape: %s", (data.num_rows, data.num_columns))
     
     # Check required columns
-    if 'department' not in df.columns:
+    if 'department' not in data.column_names:
         raise ValueError("Missing required columns: ['department']")
     
-    # Prepare data
-    departments = []
-    for _, row in df.iterrows():
-        if pd.isna(row['department']) or str(row['department']).strip() == '':
-            continue
-            
-        departments.append({
-            'department': str(row['department']).strip()
-        })
-    
-    logger.info("Prepared %d departments", len(departments))
+    # Keep non-empty department names, stripped of surrounding whitespace
+    departments = pa.table({'department': _clean_strings(data['department'])})
+    departments = departments.filter(pc.is_valid(departments['department']))
+    
+    logger.debug("Prepared %d departments", departments.num_rows)
     return departments
 
 
-def validate_jobs_data(df: pd.DataFrame) -> List[Dict[str, Any]]:
-    """Validate and prepare jobs data from DataFrame"""
+def _fill_ids(data: pa.Table, name: str, ids: pa.ChunkedArray) -> pa.Table:
+    """Set an id column, keeping any ids rows already carry and filling the rest"""
+    if name not in data.column_names:
+        return data.append_column(name, ids)
+    existing = pc.cast(data[name], pa.int64())
+    return data.set_column(data.column_names.index(name), name, pc.coalesce(existing, ids))
+
+
+def _resolve_references(
+    data: pa.Table,
+    department_index: Optional[Dict[str, int]] = None,
+    job_index: Optional[Dict[Tuple[str, int], int]] = None
+) -> pa.Table:
+    """Fill department_id/job_id from department/job name columns using preloaded indexes"""
+    # Resolved per row: rows with an id keep it, rows with only a name get the
+    # looked-up id, and unknown names stay null for the validators' null checks
+    if department_index is not None and 'department' in data.column_names:
+        data = _fill_ids(
+            data, 'department_id', _lookup_ids(_clean_strings(data['department']), department_index)
+        )
+    
+    if job_index is not None and 'job' in data.column_names and 'department_id' in data.column_names:
+        keyed_index = {f"{job}\x1f{department_id}": job_id for (job, department_id), job_id in job_index.items()}
+        data = _fill_ids(
+            data, 'job_id', _lookup_ids(_job_keys(data['job'], data['department_id']), keyed_index)
+        )
+    
+    return data
+
+
+def validate_jobs_data(
+    data: pa.Table,
+    department_index: Optional[Dict[str, int]] = None
+) -> pa.Table:
+    """Validate and prepare jobs data from an Arrow table"""
+    data = _resolve_references(data, department_index)
+    columns = data.column_names
+    
     # Handle both formats: with/without id column
-    if 'id' in df.columns and 'job' in df.columns:
+    if 'id' in columns and 'job' in columns:
         # Format: id,job (no department_id in CSV)
         required_columns = ['id', 'job']
     else:
@@ -77,39 +168,36 @@ def validate_jobs_data(df: pd.DataFrame) -> List[Dict[str, Any]]:
         required_columns = ['job', 'department_id']
     
     # Check required columns
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    missing_columns = [col for col in required_columns if col not in columns]
     if missing_columns:
         raise ValueError(f"Missing required columns: {missing_columns}")
     
-    # Prepare data
-    jobs = []
-    for _, row in df.iterrows():
-        if pd.isna(row['job']) or str(row['job']).strip() == '':
-            continue
-        
-        # Handle different formats
-        if 'department_id' in df.columns:
-            if pd.isna(row['department_id']):
-                continue
-            jobs.append({
-                'job': str(row['job']).strip(),
-                'department_id': int(row['department_id'])
-            })
-        else:
-            # For format without department_id, assign to first available department
-            # This is a simplified approach - in production you might want more sophisticated logic
-            jobs.append({
-                'job': str(row['job']).strip(),
-                'department_id': 1  # Default to first department
-            })
-    
-    return jobs
-
-
-def validate_employees_data(df: pd.DataFrame) -> List[Dict[str, Any]]:
-    """Validate and prepare employees data from DataFrame"""
+    # Handle different formats
+    jobs = _clean_strings(data['job'])
+    if 'department_id' in columns:
+        department_ids = data['department_id']
+    else:
+        # For format without department_id, assign to first available department
+        # This is a simplified approach - in production you might want more sophisticated logic
+        department_ids = pa.repeat(1, data.num_rows)  # Default to first department
+    
+    # Keep rows with a non-empty job name and a department, then fix the id type
+    jobs = pa.table({'job': jobs, 'department_id': department_ids})
+    jobs = jobs.filter(_has_values(jobs['job'], jobs['department_id']))
+    return jobs.set_column(1, 'department_id', pc.cast(jobs['department_id'], pa.int64()))
+
+
+def validate_employees_data(
+    data: pa.Table,
+    department_index: Optional[Dict[str, int]] = None,
+    job_index: Optional[Dict[Tuple[str, int], int]] = None
+) -> pa.Table:
+    """Validate and prepare employees data from an Arrow table"""
+    data = _resolve_references(data, department_index, job_index)
+    columns = data.column_names
+    
     # Handle both formats: with/without id column
-    if 'id' in df.columns:
+    if 'id' in columns:
         # Format: id,name,datetime,department_id,job_id
         required_columns = ['id', 'name', 'datetime', 'department_id', 'job_id']
     else:
@@ -117,56 +205,57 @@ def validate_employees_data(df: pd.DataFrame) -> List[Dict[str, Any]]:
         required_columns = ['name', 'datetime', 'department_id', 'job_id']
     
     # Check required columns
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    missing_columns = [col for col in required_columns if col not in columns]
     if missing_columns:
         raise ValueError(f"Missing required columns: {missing_columns}")
     
-    # Prepare data
-    employees = []
-    for _, row in df.iterrows():
-        if pd.isna(row['name']) or str(row['name']).strip() == '':
-            continue
-        if pd.isna(row['datetime']):
-            continue
-        if pd.isna(row['department_id']) or pd.isna(row['job_id']):
-            continue
-            
-        # Parse datetime
-        try:
-            if isinstance(row['datetime'], str):
-                datetime_obj = pd.to_datetime(row['datetime'])
-            else:
-                datetime_obj = row['datetime']
-        except (ValueError, TypeError, pd.errors.ParserError) as e:
-            logger.warning("Invalid datetime format for row: %s, error: %s", row, e)
-            continue
-            
-        employees.append({
-            'name': str(row['name']).strip(),
-            'datetime': datetime_obj,
-            'department_id': int(row['department_id']),
-            'job_id': int(row['job_id'])
-        })
-    
-    return employees
+    # Drop rows with missing or empty values
+    employees = pa.table({
+        'name': _clean_strings(data['name']),
+        'datetime': data['datetime'],
+        'department_id': data['department_id'],
+        'job_id': data['job_id']
+    })
+    employees = employees.filter(_has_values(*employees.columns))
+    
+    # Parse datetime in one vectorized pass, discarding rows that cannot be parsed
+    datetimes = _parse_datetimes(employees['datetime'])
+    invalid = employees.num_rows - pc.count(datetimes).as_py()
+    if invalid:
+        logger.warning("Skipping %d rows with invalid datetime format", invalid)
+    
+    employees = employees.set_column(1, 'datetime', datetimes).filter(pc.is_valid(datetimes))
+    employees = employees.set_column(2, 'department_id', pc.cast(employees['department_id'], pa.int64()))
+    return employees.set_column(3, 'job_id', pc.cast(employees['job_id'], pa.int64()))
+
+
+# Table name -> validator dispatch, built once at import time
+_VALIDATORS = {
+    'departments': validate_departments_data,
+    'jobs': validate_jobs_data,
+    'employees': validate_employees_data,
+    'hired_employees': validate_employees_data  # Same validation as employees
+}
 
 
 def get_table_validator(table_name: str):
     """Get the appropriate validator function for a table"""
-    validators = {
-        'departments': validate_departments_data,
-        'jobs': validate_jobs_data,
-        'employees': validate_employees_data,
-        'hired_employees': validate_employees_data  # Same validation as employees
-    }
-    
-    if table_name not in validators:
-        raise ValueError(f"Unsupported table: {table_name}. Supported tables: {list(validators.keys())}")
-    
-    return validators[table_name]
+    try:
+        return _VALIDATORS[table_name]
+    except KeyError:
+        raise ValueError(f"Unsupported table: {table_name}. Supported tables: {list(_VALIDATORS.keys())}") from None
+
+
+# Table name -> cached validator for a list of typed batch rows
+_BATCH_ROW_ADAPTERS = {
+    'departments': TypeAdapter(List[DepartmentBatchRow]),
+    'jobs': TypeAdapter(List[JobBatchRow]),
+    'employees': TypeAdapter(List[EmployeeBatchRow]),
+    'hired_employees': TypeAdapter(List[EmployeeBatchRow])
+}
 
 
-def validate_batch_data(data: List[Dict[str, Any]], table_name: str) -> List[Dict[str, Any]]:
+def validate_batch_data(data: List[Dict[str, Any]], table_name: str, **indexes) -> pa.Table:
     """Validate batch insert data for a specific table"""
     if not data:
         raise ValueError("Empty data list")
@@ -174,10 +263,14 @@ def validate_batch_data(data: List[Dict[str, Any]], table_name: str) -> List[Dic
     if len(data) > 1000:
         raise ValueError("Batch size cannot exceed 1000 records")
     
-    # Convert to DataFrame for validation
-    df = pd.DataFrame(data)
-    
     # Get appropriate validator
     validator = get_table_validator(table_name)
     
-    return validator(df)
+    # Type-check the rows with the table's compiled row schema (raises a
+    # ValueError subclass), then pivot the fields the client sent into columns
+    rows = _BATCH_ROW_ADAPTERS[table_name].validate_python(data)
+    rows = [row.model_dump(exclude_unset=True) for row in rows]
+    keys = dict.fromkeys(key for row in rows for key in row)
+    table = pa.table({key: [row.get(key) for row in rows] for key in keys})
+    
+    return validator(table, **indexes)
@@ -1,45 +1,134 @@
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlalchemy.pool import NullPool
 
 from src.db_migration_api.main import app
 from src.db_migration_api.database import get_db
-from src.db_migration_api.models import Base
+from src.db_migration_api.models import Base, Department, Job
 
-# Test database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
+def pytest_sessionstart(session):
+    """Build the app's middleware stack up front so the first test does not pay for it"""
+    # Routes are compiled at import; Starlette otherwise builds this on the first request
+    if app.middleware_stack is None:
+        app.middleware_stack = app.build_middleware_stack()
+
+
+# Test database URL: in-memory SQLite. The engine does not pool; the whole
+# session runs on one connection held by the db_connection fixture, since every
+# new connection would open its own empty database. Each pytest-xdist worker
+# is its own process and so gets its own database
+SQLALCHEMY_DATABASE_URL = "sqlite://"
+
+# Batch INSERTs use the same multi-row VALUES pages as the app engine
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+    poolclass=NullPool,
+    insertmanyvalues_page_size=1000,
+    future=True,
+)
+
+
+# Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work with pysqlite, and
+# trade durability for speed since the test database is disposable
+@event.listens_for(engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+    cursor.close()
+
+
+@event.listens_for(engine, "begin")
+def _emit_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+# Schema DDL compiled once, so setup is a single executescript() call
+DDL_SCRIPT = "".join(
+    f"{str(ddl).strip()};\n"
+    for table in Base.metadata.sorted_tables
+    for ddl in [CreateTable(table).compile(engine)]
+    + [CreateIndex(index).compile(engine) for index in sorted(table.indexes, key=lambda index: index.name)]
+)
+
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine, future=True
 )
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@pytest.fixture(scope="session")
+def db_connection():
+    """Open the session's single database connection and create the schema on it"""
+    connection = engine.connect()
+    connection.connection.dbapi_connection.executescript(DDL_SCRIPT)
+    yield connection
+    connection.close()
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
+
+@pytest.fixture(scope="session")
+def reference_rows(db_connection):
+    """Commit the department and job that employee rows point at (id 1) once per session"""
+    db_connection.execute(Department.__table__.insert(), {"id": 1, "department": "Reference Department"})
+    db_connection.execute(Job.__table__.insert(), {"id": 1, "job": "Reference Job", "department_id": 1})
+    db_connection.commit()
 
 
 @pytest.fixture(scope="function")
-def db_session():
-    """Create a fresh database for each test"""
-    Base.metadata.create_all(bind=engine)
-    yield TestingSessionLocal()
-    Base.metadata.drop_all(bind=engine)
+def db_session(db_connection, reference_rows):
+    """Run each test inside a transaction that is rolled back afterwards"""
+    transaction = db_connection.begin()
+    # Commits inside the app only release a SAVEPOINT of the outer transaction
+    session = TestingSessionLocal(bind=db_connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
+    transaction.rollback()
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """Run async tests and fixtures on asyncio, sharing one runner per session"""
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def _client():
+    """Create one in-process ASGI client for the whole test session"""
+    # ASGITransport sends no lifespan events, so the app's startup create_tables()
+    # never runs against the real engine; the schema comes from db_connection
+    # ASGITransport calls the app in-process with no connection pool, so there
+    # are no keep-alive limits to tune (httpx ignores limits= with a custom transport)
+    transport = ASGITransport(app=app, raise_app_exceptions=True)
+    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
+        yield test_client
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
-    """Create a test client with database override"""
+def client(_client, db_session):
+    """Shared test client with the database overridden for this test"""
+    def override_get_db():
+        yield db_session
+
     app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
-        yield test_client
+    yield _client
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="session")
+def oversize_departments_payload():
+    """Departments batch one record over the 1000-record limit, built once per session"""
+    return {"data": [{"department": f"Department {i}"} for i in range(1001)]}
+
+
+@pytest.fixture(scope="session")
+def oversize_departments_body(oversize_departments_payload):
+    """The oversize departments batch, serialized once per session"""
+    return orjson.dumps(oversize_departments_payload)
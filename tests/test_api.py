@@ -1,190 +1,487 @@
+import asyncio
+import io
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock
+
 import pytest
-from fastapi.testclient import TestClient
-from io import BytesIO
-import json
+from fastapi import HTTPException, UploadFile
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
+import orjson
+import pyarrow as pa
+
+from src.db_migration_api.main import app
+from src.db_migration_api.crud import bulk_load_arrow
+from src.db_migration_api.database import get_db, make_engine
+from src.db_migration_api.models import Base, Department, Employee, Job
+from src.db_migration_api.routes import upload_csv, batch_insert
+from src.db_migration_api.schemas import BatchInsertRequest
+from src.db_migration_api.utils import _parse_datetimes
+
+pytestmark = pytest.mark.anyio
+
+# Headerless CSV request bodies in each table's column layout, encoded once at import time
+DEPARTMENTS_CSV = b"1,Engineering\n2,Marketing\n"
+JOBS_CSV = b"1,Software Engineer\n2,Marketing Manager\n"
+EMPLOYEES_CSV = b"1,John Doe,2023-01-15T09:00:00Z,1,1\n"
+INVALID_TABLE_CSV = b"1,Test\n"
+NOT_A_CSV = b"This is not a CSV"
+MIXED_EMPLOYEES_CSV = (
+    b"1,Offset Person,2021-11-07T02:48:42-05:00,1,1\n"
+    b"2,Missing Job,2021-05-30T05:43:46Z,1,\n"
+    b"3,,2021-09-01T23:27:38Z,1,1\n"
+    b"4,Bad Date,not a date,1,1\n"
+    b"5,Minute Person,2021-11-07 02:48,1,1\n"
+)
+COPY_JOBS_CSV = b"".join(b"%d,Job %d\n" % (i, i) for i in range(501))
+OVERSIZED_DEPARTMENTS_CSV = b"1,Product Management\n2,Sales\n"
+
+# Batch-insert request bodies, serialized with orjson once at import time
+JSON_HEADERS = {"content-type": "application/json"}
+DEPARTMENTS_BATCH_BODY = orjson.dumps({
+    "data": [
+        {"department": "Engineering"},
+        {"department": "Marketing"}
+    ]
+})
+JOBS_BATCH_BODY = orjson.dumps({
+    "data": [
+        {"job": "Software Engineer", "department_id": 1},
+        {"job": "Marketing Manager", "department_id": 1}
+    ]
+})
+EMPLOYEES_BATCH_BODY = orjson.dumps({
+    "data": [
+        {
+            "name": "John Doe",
+            "datetime": "2023-01-15T09:00:00",
+            "department_id": 1,
+            "job_id": 1
+        }
+    ]
+})
+SALES_DEPARTMENT_BATCH_BODY = orjson.dumps({"data": [{"department": "Sales"}]})
+SALES_JOB_BATCH_BODY = orjson.dumps({"data": [{"job": "Account Executive", "department": "Sales"}]})
+MIXED_REFERENCE_JOBS_BATCH_BODY = orjson.dumps({
+    "data": [
+        {"job": "Data Engineer", "department_id": 1},
+        {"job": "Data Analyst", "department": "Reference Department"}
+    ]
+})
+UNKNOWN_FIELD_BATCH_BODY = orjson.dumps({"data": [{"name": "Engineering"}]})
+WRONG_TYPE_BATCH_BODY = orjson.dumps({"data": [{"job": "Software Engineer", "department_id": "first"}]})
+AWARE_DATETIME_EMPLOYEES_BATCH_BODY = orjson.dumps({
+    "data": [
+        {
+            "name": "Jane Roe",
+            "datetime": "2023-01-15T09:00:00-05:00",
+            "department_id": 1,
+            "job_id": 1
+        }
+    ]
+})
+DUPLICATE_DEPARTMENTS_BATCH_BODY = orjson.dumps({"data": [{"department": "Sales"}, {"department": "Sales"}]})
+NAMED_EMPLOYEES_BATCH_BODY = orjson.dumps({
+    "data": [
+        {
+            "name": "Jane Roe",
+            "datetime": "2023-01-15T09:00:00",
+            "department": "Sales",
+            "job": "Account Executive"
+        },
+        {
+            "name": "John Doe",
+            "datetime": "2023-01-15T09:00:00",
+            "department": "Unknown",
+            "job": "Account Executive"
+        }
+    ]
+})
+
+
+# Table name -> model, for checking what the endpoints actually stored
+TABLE_MODELS = {"departments": Department, "jobs": Job, "employees": Employee}
 
 
-def test_health_endpoint(client: TestClient):
+def _count_rows(db: Session, table: str) -> int:
+    """Count the rows currently stored in a table"""
+    return db.execute(select(func.count()).select_from(TABLE_MODELS[table])).scalar_one()
+
+
+async def test_health_endpoint(client: AsyncClient):
     """Test health check endpoint"""
-    response = client.get("/health")
+    response = await client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
 
-def test_upload_csv_departments(client: TestClient):
-    """Test CSV upload for departments"""
-    csv_content = "name\nEngineering\nMarketing"
-    csv_file = BytesIO(csv_content.encode())
-    
-    response = client.post(
-        "/upload-csv?table=departments",
-        files={"file": ("departments.csv", csv_file, "text/csv")}
+@pytest.mark.parametrize("table,body,expected", [
+    ("departments", DEPARTMENTS_CSV, 2),
+    ("jobs", JOBS_CSV, 2),
+    ("employees", EMPLOYEES_CSV, 1),
+], ids=["departments", "jobs", "employees"])
+async def test_upload_csv(client: AsyncClient, db_session: Session, table: str, body: bytes, expected: int):
+    """Test CSV upload for each table"""
+    stored = _count_rows(db_session, table)
+    response = await client.post(
+        f"/upload-csv?table={table}",
+        files={"file": (f"{table}.csv", body, "text/csv")}
     )
     
     assert response.status_code == 200
     data = response.json()
-    assert data["records_inserted"] == 2
+    assert data["records_inserted"] == expected
     assert "Successfully uploaded" in data["message"]
+    assert _count_rows(db_session, table) == stored + expected
 
 
-def test_upload_csv_jobs(client: TestClient):
-    """Test CSV upload for jobs"""
-    csv_content = "name,department_id\nSoftware Engineer,1\nMarketing Manager,2"
-    csv_file = BytesIO(csv_content.encode())
-    
-    response = client.post(
-        "/upload-csv?table=jobs",
-        files={"file": ("jobs.csv", csv_file, "text/csv")}
+async def test_upload_csv_skips_incomplete_employees(client: AsyncClient, db_session: Session):
+    """Test CSV upload storing offset datetimes as naive UTC and skipping incomplete rows"""
+    response = await client.post(
+        "/upload-csv?table=employees",
+        files={"file": ("employees.csv", MIXED_EMPLOYEES_CSV, "text/csv")}
     )
     
     assert response.status_code == 200
-    data = response.json()
-    assert data["records_inserted"] == 2
-    assert "Successfully uploaded" in data["message"]
+    assert response.json()["records_inserted"] == 2
+    stored = dict(db_session.execute(select(Employee.name, Employee.datetime)).all())
+    assert stored == {
+        "Offset Person": datetime(2021, 11, 7, 7, 48, 42),
+        "Minute Person": datetime(2021, 11, 7, 2, 48, 0)
+    }
 
 
-def test_upload_csv_employees(client: TestClient):
-    """Test CSV upload for employees"""
-    csv_content = "name,datetime,department_id,job_id\nJohn Doe,2023-01-15 09:00:00,1,1"
-    csv_file = BytesIO(csv_content.encode())
-    
-    response = client.post(
-        "/upload-csv?table=employees",
-        files={"file": ("employees.csv", csv_file, "text/csv")}
+async def test_upload_csv_example_hired_employees(client: AsyncClient):
+    """Test uploading the bundled example, whose 70 incomplete rows are skipped"""
+    body = (Path(__file__).parent.parent / "examples" / "hired_employees.csv").read_bytes()
+    response = await client.post(
+        "/upload-csv?table=hired_employees",
+        files={"file": ("hired_employees.csv", body, "text/csv")}
     )
     
     assert response.status_code == 200
-    data = response.json()
-    assert data["records_inserted"] == 1
-    assert "Successfully uploaded" in data["message"]
+    assert response.json()["records_inserted"] == 1929
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("2021-11-07T02:48:42Z", datetime(2021, 11, 7, 2, 48, 42)),
+    ("2021-11-07T02:48:42+05:00", datetime(2021, 11, 6, 21, 48, 42)),
+    ("2021-11-07T02:48:42-03:30", datetime(2021, 11, 7, 6, 18, 42)),
+    ("2021-11-07T02:48:42+05", datetime(2021, 11, 6, 21, 48, 42)),
+    ("2021-11-07 02:48:42", datetime(2021, 11, 7, 2, 48, 42)),
+    ("2021-11-07T02:48:42.123456Z", datetime(2021, 11, 7, 2, 48, 42)),
+    ("2021-11-07T02:48", datetime(2021, 11, 7, 2, 48, 0)),
+    ("2021-11-07", datetime(2021, 11, 7)),
+    (" 2021-11-07T02:48:42Z ", datetime(2021, 11, 7, 2, 48, 42)),
+    ("not a date", None),
+    ("2021-13-07T02:48:42", None),
+    ("07/11/2021 02:48", None),
+    ("2021-11-07T02", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_datetimes(value, expected):
+    """Test ISO 8601 parsing to naive UTC, with unparseable values as null"""
+    parsed = _parse_datetimes(pa.chunked_array([[value]], type=pa.string()))
+    assert parsed.type == pa.timestamp("us")
+    assert parsed.to_pylist() == [expected]
 
 
-def test_upload_csv_invalid_table(client: TestClient):
+def test_upload_csv_invalid_table():
     """Test CSV upload with invalid table name"""
-    csv_content = "name\nTest"
-    csv_file = BytesIO(csv_content.encode())
+    file = UploadFile(file=io.BytesIO(INVALID_TABLE_CSV), filename="test.csv")
     
-    response = client.post(
-        "/upload-csv?table=invalid_table",
-        files={"file": ("test.csv", csv_file, "text/csv")}
-    )
+    with pytest.raises(HTTPException) as exc_info:
+        upload_csv(table="invalid_table", file=file, db=Mock(spec=Session))
     
-    assert response.status_code == 400
-    assert "Invalid table name" in response.json()["detail"]
+    assert exc_info.value.status_code == 400
+    assert "Invalid table name" in exc_info.value.detail
 
 
-def test_upload_csv_invalid_file_type(client: TestClient):
+def test_upload_csv_invalid_file_type():
     """Test CSV upload with invalid file type"""
-    content = "This is not a CSV"
-    file = BytesIO(content.encode())
+    file = UploadFile(file=io.BytesIO(NOT_A_CSV), filename="test.txt")
     
-    response = client.post(
-        "/upload-csv?table=departments",
-        files={"file": ("test.txt", file, "text/plain")}
-    )
+    with pytest.raises(HTTPException) as exc_info:
+        upload_csv(table="departments", file=file, db=Mock(spec=Session))
     
-    assert response.status_code == 400
-    assert "File must be a CSV" in response.json()["detail"]
+    assert exc_info.value.status_code == 400
+    assert "File must be a CSV" in exc_info.value.detail
 
 
-def test_batch_insert_departments(client: TestClient):
-    """Test batch insert for departments"""
-    data = {
-        "data": [
-            {"name": "Engineering"},
-            {"name": "Marketing"}
-        ]
-    }
-    
-    response = client.post(
-        "/batch-insert?table=departments",
-        json=data
+@pytest.mark.parametrize("table,body,expected", [
+    ("departments", DEPARTMENTS_BATCH_BODY, 2),
+    ("jobs", JOBS_BATCH_BODY, 2),
+    ("employees", EMPLOYEES_BATCH_BODY, 1),
+], ids=["departments", "jobs", "employees"])
+async def test_batch_insert(client: AsyncClient, db_session: Session, table: str, body: bytes, expected: int):
+    """Test batch insert for each table"""
+    stored = _count_rows(db_session, table)
+    response = await client.post(
+        f"/batch-insert?table={table}",
+        content=body,
+        headers=JSON_HEADERS
     )
     
     assert response.status_code == 200
     response_data = response.json()
-    assert response_data["records_inserted"] == 2
+    assert response_data["records_inserted"] == expected
     assert "Successfully inserted" in response_data["message"]
+    assert _count_rows(db_session, table) == stored + expected
 
 
-def test_batch_insert_jobs(client: TestClient):
-    """Test batch insert for jobs"""
-    data = {
-        "data": [
-            {"name": "Software Engineer", "department_id": 1},
-            {"name": "Marketing Manager", "department_id": 2}
-        ]
-    }
+def test_batch_insert_invalid_table():
+    """Test batch insert with invalid table name"""
+    request = BatchInsertRequest(data=[{"name": "Test"}])
     
-    response = client.post(
-        "/batch-insert?table=jobs",
-        json=data
+    with pytest.raises(HTTPException) as exc_info:
+        batch_insert(table="invalid_table", request=request, db=Mock(spec=Session))
+    
+    assert exc_info.value.status_code == 400
+    assert "Invalid table name" in exc_info.value.detail
+
+
+def test_batch_insert_empty_data():
+    """Test batch insert with empty data"""
+    # model_construct skips the schema's min_length so the handler's own check runs
+    request = BatchInsertRequest.model_construct(data=[])
+    
+    with pytest.raises(HTTPException) as exc_info:
+        batch_insert(table="departments", request=request, db=Mock(spec=Session))
+    
+    assert exc_info.value.status_code == 400
+    assert "Empty data list" in exc_info.value.detail
+
+
+async def test_batch_insert_too_many_records(client: AsyncClient, oversize_departments_body: bytes):
+    """Test batch insert with too many records"""
+    response = await client.post(
+        "/batch-insert?table=departments",
+        content=oversize_departments_body,
+        headers=JSON_HEADERS
     )
     
-    assert response.status_code == 200
-    response_data = response.json()
-    assert response_data["records_inserted"] == 2
-    assert "Successfully inserted" in response_data["message"]
+    # The request schema's max_length rejects the body before the handler runs
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "too_long"
 
 
-def test_batch_insert_employees(client: TestClient):
-    """Test batch insert for employees"""
-    data = {
-        "data": [
-            {
-                "name": "John Doe",
-                "datetime": "2023-01-15T09:00:00",
-                "department_id": 1,
-                "job_id": 1
-            }
-        ]
-    }
+def test_batch_insert_too_many_records_handler(oversize_departments_payload: dict):
+    """Test the batch insert handler's own batch size check"""
+    # model_construct skips the schema's max_length so the handler's own check runs
+    request = BatchInsertRequest.model_construct(**oversize_departments_payload)
+    
+    with pytest.raises(HTTPException) as exc_info:
+        batch_insert(table="departments", request=request, db=Mock(spec=Session))
+    
+    assert exc_info.value.status_code == 400
+    assert "Batch size cannot exceed 1000 records" in exc_info.value.detail
+
+
+async def test_batch_insert_resolves_reference_names(client: AsyncClient, db_session: Session):
+    """Test batch insert resolving department and job names to ids"""
+    department_response = await client.post(
+        "/batch-insert?table=departments",
+        content=SALES_DEPARTMENT_BATCH_BODY,
+        headers=JSON_HEADERS
+    )
+    job_response = await client.post(
+        "/batch-insert?table=jobs",
+        content=SALES_JOB_BATCH_BODY,
+        headers=JSON_HEADERS
+    )
+    assert department_response.status_code == 200
+    assert job_response.status_code == 200
     
-    response = client.post(
+    response = await client.post(
         "/batch-insert?table=employees",
-        json=data
+        content=NAMED_EMPLOYEES_BATCH_BODY,
+        headers=JSON_HEADERS
     )
     
     assert response.status_code == 200
-    response_data = response.json()
-    assert response_data["records_inserted"] == 1
-    assert "Successfully inserted" in response_data["message"]
+    assert response.json()["records_inserted"] == 1
+    
+    sales = db_session.execute(select(Department).where(Department.department == "Sales")).scalar_one()
+    account_executive = db_session.execute(select(Job).where(Job.job == "Account Executive")).scalar_one()
+    employee = db_session.execute(select(Employee).where(Employee.name == "Jane Roe")).scalar_one()
+    assert employee.department_id == sales.id
+    assert employee.job_id == account_executive.id
 
 
-def test_batch_insert_invalid_table(client: TestClient):
-    """Test batch insert with invalid table name"""
-    data = {"data": [{"name": "Test"}]}
+async def test_batch_insert_mixes_ids_and_names(client: AsyncClient, db_session: Session):
+    """Test batch insert resolving names per row when other rows carry ids"""
+    response = await client.post(
+        "/batch-insert?table=jobs",
+        content=MIXED_REFERENCE_JOBS_BATCH_BODY,
+        headers=JSON_HEADERS
+    )
+    
+    assert response.status_code == 200
+    assert response.json()["records_inserted"] == 2
     
-    response = client.post(
-        "/batch-insert?table=invalid_table",
-        json=data
+    # The name-only row resolves "Reference Department" to the seeded id 1
+    stored = dict(db_session.execute(
+        select(Job.job, Job.department_id).where(Job.job.in_(["Data Engineer", "Data Analyst"]))
+    ).all())
+    assert stored == {"Data Engineer": 1, "Data Analyst": 1}
+
+
+@pytest.mark.parametrize("table,body,message", [
+    ("departments", UNKNOWN_FIELD_BATCH_BODY, "Extra inputs are not permitted"),
+    ("jobs", WRONG_TYPE_BATCH_BODY, "valid integer"),
+], ids=["unknown_field", "wrong_type"])
+async def test_batch_insert_invalid_rows(client: AsyncClient, table: str, body: bytes, message: str):
+    """Test batch insert rejecting rows that do not match the table's row schema"""
+    response = await client.post(
+        f"/batch-insert?table={table}",
+        content=body,
+        headers=JSON_HEADERS
     )
     
     assert response.status_code == 400
-    assert "Invalid table name" in response.json()["detail"]
+    assert message in response.json()["detail"]
 
 
-def test_batch_insert_empty_data(client: TestClient):
-    """Test batch insert with empty data"""
-    data = {"data": []}
+async def test_batch_insert_aware_datetime_stored_as_naive_utc(client: AsyncClient, db_session: Session):
+    """Test batch insert converting timezone-aware datetimes to naive UTC"""
+    response = await client.post(
+        "/batch-insert?table=employees",
+        content=AWARE_DATETIME_EMPLOYEES_BATCH_BODY,
+        headers=JSON_HEADERS
+    )
     
-    response = client.post(
+    assert response.status_code == 200
+    employee = db_session.execute(select(Employee).where(Employee.name == "Jane Roe")).scalar_one()
+    assert employee.datetime == datetime(2023, 1, 15, 14, 0, 0)
+
+
+async def test_batch_insert_duplicate_records(client: AsyncClient):
+    """Test batch insert rejecting rows that violate a unique key with 409"""
+    response = await client.post(
         "/batch-insert?table=departments",
-        json=data
+        content=DUPLICATE_DEPARTMENTS_BATCH_BODY,
+        headers=JSON_HEADERS
     )
     
-    assert response.status_code == 400
-    assert "Empty data list" in response.json()["detail"]
+    assert response.status_code == 409
+    assert "conflict" in response.json()["detail"]
 
 
-def test_batch_insert_too_many_records(client: TestClient):
-    """Test batch insert with too many records"""
-    data = {"data": [{"name": f"Department {i}"} for i in range(1001)]}
+async def test_upload_csv_duplicate_jobs(client: AsyncClient):
+    """Test re-uploading the same jobs CSV is rejected with 409"""
+    files = {"file": ("jobs.csv", JOBS_CSV, "text/csv")}
+    first = await client.post("/upload-csv?table=jobs", files=files)
+    second = await client.post("/upload-csv?table=jobs", files=files)
     
-    response = client.post(
-        "/batch-insert?table=departments",
-        json=data
+    assert first.status_code == 200
+    assert second.status_code == 409
+    assert "conflict" in second.json()["detail"]
+
+
+class StubDBAPIIntegrityError(Exception):
+    """Stands in for psycopg2's IntegrityError in the COPY tests"""
+
+
+def _postgres_session(copy_expert) -> MagicMock:
+    """Mock session on a PostgreSQL bind whose raw cursor runs COPY through copy_expert"""
+    db = MagicMock(spec=Session)
+    dialect = db.get_bind.return_value.dialect
+    dialect.name = "postgresql"
+    dialect.loaded_dbapi = SimpleNamespace(IntegrityError=StubDBAPIIntegrityError)
+    cursor = db.connection.return_value.connection.cursor.return_value.__enter__.return_value
+    cursor.copy_expert.side_effect = copy_expert
+    return db
+
+
+def test_bulk_load_arrow_copy():
+    """Test large batches on PostgreSQL are loaded with COPY from CSV"""
+    copied = {}
+    
+    def copy_expert(sql, buffer):
+        copied["sql"] = sql
+        copied["payload"] = buffer.read()
+    
+    db = _postgres_session(copy_expert)
+    data = pa.table({"job": [f"Job {i}" for i in range(501)], "department_id": [1] * 501})
+    
+    assert bulk_load_arrow(db, data, "jobs") == 501
+    assert copied["sql"] == "COPY jobs (job, department_id) FROM STDIN WITH (FORMAT csv)"
+    lines = copied["payload"].splitlines()
+    assert len(lines) == 501
+    assert lines[0] == b'"Job 0",1'
+    db.commit.assert_called_once()
+
+
+def test_upload_csv_copy_conflict():
+    """Test a unique-key violation raised by COPY is rejected with 409"""
+    def copy_expert(sql, buffer):
+        raise StubDBAPIIntegrityError("duplicate key value violates unique constraint")
+    
+    db = _postgres_session(copy_expert)
+    file = UploadFile(file=io.BytesIO(COPY_JOBS_CSV), filename="jobs.csv")
+    
+    with pytest.raises(HTTPException) as exc_info:
+        upload_csv(table="jobs", file=file, db=db)
+    
+    assert exc_info.value.status_code == 409
+    db.rollback.assert_called()
+    db.commit.assert_not_called()
+
+
+async def test_upload_csv_file_too_large(client: AsyncClient, monkeypatch):
+    """Test CSV upload rejecting files above the size limit"""
+    monkeypatch.setattr("src.db_migration_api.routes.MAX_UPLOAD_BYTES", 10)
+    
+    response = await client.post(
+        "/upload-csv?table=departments",
+        files={"file": ("departments.csv", OVERSIZED_DEPARTMENTS_CSV, "text/csv")}
     )
     
-    assert response.status_code == 400
-    assert "Batch size cannot exceed 1000 records" in response.json()["detail"]
+    assert response.status_code == 413
+    assert "File too large" in response.json()["detail"]
+
+
+async def test_batch_insert_concurrent_requests(_client: AsyncClient, tmp_path):
+    """Test concurrent batch inserts each commit or roll back only their own rows"""
+    # A file database with the app's own engine setup, so requests run in parallel
+    # threadpool workers on separate pooled connections
+    engine = make_engine(f"sqlite:///{tmp_path / 'concurrency.db'}")
+    Base.metadata.create_all(bind=engine)
+    ConcurrentSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    
+    def override_get_db():
+        db = ConcurrentSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    valid_bodies = [
+        orjson.dumps({"data": [{"department": f"Department {i}-{j}"} for j in range(200)]})
+        for i in range(10)
+    ]
+    duplicate_bodies = [
+        orjson.dumps({"data": [{"department": f"Duplicate {i}"}, {"department": f"Duplicate {i}"}]})
+        for i in range(10)
+    ]
+    
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        responses = await asyncio.gather(*(
+            _client.post("/batch-insert?table=departments", content=body, headers=JSON_HEADERS)
+            for body in valid_bodies + duplicate_bodies
+        ))
+    finally:
+        app.dependency_overrides.clear()
+    
+    with engine.connect() as connection:
+        stored = connection.execute(select(func.count()).select_from(Department)).scalar_one()
+    engine.dispose()
+    
+    assert [response.status_code for response in responses[:10]] == [200] * 10
+    assert [response.status_code for response in responses[10:]] == [409] * 10
+    assert stored == 2000